@@ -4,6 +4,7 @@ Example usage of the n8n MCP server with Claude Agent SDK
 
 from claude_agent_sdk import ClaudeSDKClient, ClaudeAgentOptions
 from src.n8n_mcp_server import n8n_server
+from src.n8n_client import close_n8n_session
 import asyncio
 from dotenv import load_dotenv
 
@@ -21,38 +22,43 @@ async def main():
             "mcp__n8n__list_workflows",
             "mcp__n8n__get_workflow",
             "mcp__n8n__execute_workflow",
+            "mcp__n8n__batch_get_workflows",
             "mcp__n8n__get_execution",
             "mcp__n8n__activate_workflow",
             "mcp__n8n__deactivate_workflow"
         ]
     )
 
-    async with ClaudeSDKClient(options=options) as client:
-        print("=== Example 1: List all workflows ===")
-        await client.query("Show me all the workflows in n8n")
-        async for message in client.receive_response():
-            print(message)
-        print()
+    try:
+        async with ClaudeSDKClient(options=options) as client:
+            print("=== Example 1: List all workflows ===")
+            await client.query("Show me all the workflows in n8n")
+            async for message in client.receive_response():
+                print(message)
+            print()
 
-        print("=== Example 2: Get specific workflow details ===")
-        await client.query("Get the details of workflow with ID '1'")
-        async for message in client.receive_response():
-            print(message)
-        print()
+            print("=== Example 2: Get specific workflow details ===")
+            await client.query("Get the details of workflow with ID '1'")
+            async for message in client.receive_response():
+                print(message)
+            print()
 
-        print("=== Example 3: Execute a workflow ===")
-        await client.query("Execute the workflow with ID '1'")
-        async for message in client.receive_response():
-            print(message)
-        print()
+            print("=== Example 3: Execute a workflow ===")
+            await client.query("Execute the workflow with ID '1'")
+            async for message in client.receive_response():
+                print(message)
+            print()
 
-        print("=== Example 4: Complex query ===")
-        await client.query(
-            "List all my n8n workflows and tell me which ones are active. "
-            "Then execute the first active workflow you find."
-        )
-        async for message in client.receive_response():
-            print(message)
+            print("=== Example 4: Complex query ===")
+            await client.query(
+                "List all my n8n workflows and tell me which ones are active. "
+                "Then execute the first active workflow you find."
+            )
+            async for message in client.receive_response():
+                print(message)
+    finally:
+        # Release the shared n8n HTTP session before the loop closes
+        await close_n8n_session()
 
 
 if __name__ == "__main__":
@@ -7,326 +7,372 @@ Uses the MCP Python SDK to provide n8n workflow tools to Claude Desktop
 import asyncio
 import os
 import sys
-import ssl
-import json
-from typing import Any
-import aiohttp
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+import orjson
+
+# Make the repo root importable so the shared client resolves regardless of
+# where Claude Desktop launches this script from
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import MCP SDK
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
-# n8n configuration
-N8N_BASE_URL = os.getenv("N8N_BASE_URL", "http://localhost:5678").rstrip("/")
-N8N_API_KEY = os.getenv("N8N_API_KEY", "")
-N8N_SKIP_SSL_VERIFY = os.getenv("N8N_SKIP_SSL_VERIFY", "false").lower() == "true"
+# Shared n8n API client (owns config, SSL context, and the keep-alive session)
+from src.n8n_client import make_n8n_request, close_n8n_session
 
 # Create MCP server
 app = Server("n8n-mcp-custom")
 
-
-async def make_n8n_request(
-    method: str,
-    endpoint: str,
-    data: dict = None
-) -> dict[str, Any]:
-    """Helper function to make requests to n8n API"""
-    if not N8N_API_KEY:
-        return {
-            "error": "N8N_API_KEY not configured. Set environment variable N8N_API_KEY."
+# Cap on node lines in get_workflow output; huge workflows would otherwise
+# produce KB of text that clients truncate anyway
+_MAX_NODES_SHOWN = 100
+
+
+# Tool schemas are immutable, so build them once at import instead of
+# re-allocating the whole list on every list_tools request
+_TOOLS: list[Tool] = [
+    Tool(
+        name="list_workflows",
+        description="List all workflows in n8n. Returns workflow names, IDs, and active status.",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": []
         }
-
-    url = f"{N8N_BASE_URL}/api/v1/{endpoint}"
-    headers = {
-        "X-N8N-API-KEY": N8N_API_KEY,
-        "Content-Type": "application/json"
-    }
-
-    # Configure SSL context
-    ssl_context = None
-    if N8N_SKIP_SSL_VERIFY:
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-
-    try:
-        connector = aiohttp.TCPConnector(ssl=ssl_context) if ssl_context else None
-        async with aiohttp.ClientSession(connector=connector) as session:
-            if method == "GET":
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        return {"error": f"HTTP {response.status}: {error_text}"}
-
-            elif method == "POST":
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status in [200, 201]:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        return {"error": f"HTTP {response.status}: {error_text}"}
-
-            elif method == "PATCH":
-                async with session.patch(url, headers=headers, json=data) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        return {"error": f"HTTP {response.status}: {error_text}"}
-
-            elif method == "DELETE":
-                async with session.delete(url, headers=headers) as response:
-                    if response.status in [200, 204]:
-                        return {"success": True}
-                    else:
-                        error_text = await response.text()
-                        return {"error": f"HTTP {response.status}: {error_text}"}
-
-    except Exception as e:
-        return {"error": f"Request failed: {str(e)}"}
+    ),
+    Tool(
+        name="get_workflow",
+        description="Get detailed information about a specific workflow by ID.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "workflow_id": {
+                    "type": "string",
+                    "description": "The ID of the workflow"
+                }
+            },
+            "required": ["workflow_id"]
+        }
+    ),
+    Tool(
+        name="execute_workflow",
+        description="Execute a workflow by ID. Optionally pass input data as JSON string.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "workflow_id": {
+                    "type": "string",
+                    "description": "The ID of the workflow to execute"
+                },
+                "input_data": {
+                    "type": "string",
+                    "description": "Optional JSON string with input data for the workflow"
+                }
+            },
+            "required": ["workflow_id"]
+        }
+    ),
+    Tool(
+        name="batch_get_workflows",
+        description="Get details for several workflows at once by their IDs. Fetches them concurrently.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "workflow_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The IDs of the workflows to fetch"
+                }
+            },
+            "required": ["workflow_ids"]
+        }
+    ),
+    Tool(
+        name="get_execution",
+        description="Get the status and result of a workflow execution by execution ID.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "execution_id": {
+                    "type": "string",
+                    "description": "The execution ID to check"
+                }
+            },
+            "required": ["execution_id"]
+        }
+    ),
+    Tool(
+        name="activate_workflow",
+        description="Activate (enable) a workflow by ID so it can run automatically.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "workflow_id": {
+                    "type": "string",
+                    "description": "The ID of the workflow to activate"
+                }
+            },
+            "required": ["workflow_id"]
+        }
+    ),
+    Tool(
+        name="deactivate_workflow",
+        description="Deactivate (disable) a workflow by ID to stop it from running automatically.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "workflow_id": {
+                    "type": "string",
+                    "description": "The ID of the workflow to deactivate"
+                }
+            },
+            "required": ["workflow_id"]
+        }
+    )
+]
 
 
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available n8n tools"""
-    return [
-        Tool(
-            name="list_workflows",
-            description="List all workflows in n8n. Returns workflow names, IDs, and active status.",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": []
-            }
-        ),
-        Tool(
-            name="get_workflow",
-            description="Get detailed information about a specific workflow by ID.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "workflow_id": {
-                        "type": "string",
-                        "description": "The ID of the workflow"
-                    }
-                },
-                "required": ["workflow_id"]
-            }
-        ),
-        Tool(
-            name="execute_workflow",
-            description="Execute a workflow by ID. Optionally pass input data as JSON string.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "workflow_id": {
-                        "type": "string",
-                        "description": "The ID of the workflow to execute"
-                    },
-                    "input_data": {
-                        "type": "string",
-                        "description": "Optional JSON string with input data for the workflow"
-                    }
-                },
-                "required": ["workflow_id"]
-            }
-        ),
-        Tool(
-            name="get_execution",
-            description="Get the status and result of a workflow execution by execution ID.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "execution_id": {
-                        "type": "string",
-                        "description": "The execution ID to check"
-                    }
-                },
-                "required": ["execution_id"]
-            }
-        ),
-        Tool(
-            name="activate_workflow",
-            description="Activate (enable) a workflow by ID so it can run automatically.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "workflow_id": {
-                        "type": "string",
-                        "description": "The ID of the workflow to activate"
-                    }
-                },
-                "required": ["workflow_id"]
-            }
-        ),
-        Tool(
-            name="deactivate_workflow",
-            description="Deactivate (disable) a workflow by ID to stop it from running automatically.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "workflow_id": {
-                        "type": "string",
-                        "description": "The ID of the workflow to deactivate"
-                    }
-                },
-                "required": ["workflow_id"]
-            }
-        )
-    ]
+    return _TOOLS
 
 
-@app.call_tool()
-async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    """Handle tool calls"""
+def _workflow_line(wf: dict) -> str:
+    """Format a one-line summary of a workflow"""
+    get = wf.get
+    return (
+        f"- {get('name', 'Unnamed')} (ID: {get('id')}) "
+        f"[{'Active' if get('active') else 'Inactive'}]"
+    )
 
-    if name == "list_workflows":
-        result = await make_n8n_request("GET", "workflows")
 
-        if "error" in result:
-            return [TextContent(type="text", text=f"Error: {result['error']}")]
+async def _handle_list_workflows(arguments: dict) -> list[TextContent]:
+    """Handle the list_workflows tool"""
+    result = await make_n8n_request("GET", "workflows")
 
-        workflows = result.get("data", [])
+    if "error" in result:
+        return [TextContent.model_construct(type="text", text=f"Error: {result['error']}")]
 
-        if not workflows:
-            return [TextContent(type="text", text="No workflows found in n8n.")]
+    workflows = result.get("data", [])
 
-        workflow_list = []
-        for wf in workflows:
-            workflow_list.append(
-                f"- {wf.get('name', 'Unnamed')} (ID: {wf.get('id')}) "
-                f"[{'Active' if wf.get('active') else 'Inactive'}]"
-            )
+    if not workflows:
+        return [TextContent.model_construct(type="text", text="No workflows found in n8n.")]
 
-        response_text = f"Found {len(workflows)} workflow(s):\n" + "\n".join(workflow_list)
-        return [TextContent(type="text", text=response_text)]
+    if len(workflows) > 50:
+        # Yield to the event loop periodically so formatting a big listing
+        # doesn't starve the stdio reader or other ready tasks
+        lines = []
+        for i, wf in enumerate(workflows):
+            if i % 32 == 0:
+                await asyncio.sleep(0)
+            lines.append(_workflow_line(wf))
+        body = "\n".join(lines)
+    else:
+        body = "\n".join(map(_workflow_line, workflows))
 
-    elif name == "get_workflow":
-        workflow_id = arguments.get("workflow_id")
-        result = await make_n8n_request("GET", f"workflows/{workflow_id}")
+    response_text = f"Found {len(workflows)} workflow(s):\n" + body
+    return [TextContent.model_construct(type="text", text=response_text)]
 
-        if "error" in result:
-            return [TextContent(type="text", text=f"Error: {result['error']}")]
-
-        # Handle both nested and flat response structures
-        if "data" in result:
-            wf = result.get("data", {})
-        else:
-            wf = result
-
-        # Get nodes and connections
-        nodes = wf.get('nodes', [])
-        connections = wf.get('connections', {})
-
-        info = [
-            f"Workflow: {wf.get('name', 'Unnamed')}",
-            f"ID: {wf.get('id')}",
-            f"Status: {'Active' if wf.get('active') else 'Inactive'}",
-            f"Nodes: {len(nodes)}",
-            f"Connections: {len(connections)}",
-        ]
-
-        # Add node details if available
-        if nodes:
-            info.append(f"\nNodes in workflow:")
-            for node in nodes:
-                node_type = node.get('type', 'Unknown')
-                node_name = node.get('name', 'Unnamed')
-                info.append(f"  - {node_name} ({node_type})")
-
-        if wf.get('tags'):
-            info.append(f"\nTags: {', '.join([tag.get('name', '') for tag in wf.get('tags', [])])}")
-
-        return [TextContent(type="text", text="\n".join(info))]
-
-    elif name == "execute_workflow":
-        workflow_id = arguments.get("workflow_id")
-        input_data = arguments.get("input_data", "{}")
-
-        # Parse input data
-        try:
-            data_payload = json.loads(input_data) if input_data else {}
-        except json.JSONDecodeError:
-            return [TextContent(type="text", text="Error: input_data must be valid JSON string")]
-
-        result = await make_n8n_request(
-            "POST",
-            f"workflows/{workflow_id}/execute",
-            data_payload
+
+async def _handle_get_workflow(arguments: dict) -> list[TextContent]:
+    """Handle the get_workflow tool"""
+    workflow_id = arguments.get("workflow_id")
+    result = await make_n8n_request("GET", f"workflows/{workflow_id}")
+
+    if "error" in result:
+        return [TextContent.model_construct(type="text", text=f"Error: {result['error']}")]
+
+    # Handle both nested and flat response structures
+    if "data" in result:
+        wf = result.get("data", {})
+    else:
+        wf = result
+
+    # Bind the lookup once; the formatters below hit it repeatedly
+    get = wf.get
+
+    # Get nodes and connections
+    nodes = get('nodes', [])
+    connections = get('connections', {})
+
+    info = [
+        f"Workflow: {get('name', 'Unnamed')}",
+        f"ID: {get('id')}",
+        f"Status: {'Active' if get('active') else 'Inactive'}",
+        f"Nodes: {len(nodes)}",
+        f"Connections: {len(connections)}",
+    ]
+
+    # Add node details if available, capped for very large workflows
+    if nodes:
+        info.append(f"\nNodes in workflow:")
+        info.extend(
+            f"  - {node.get('name', 'Unnamed')} ({node.get('type', 'Unknown')})"
+            for node in nodes[:_MAX_NODES_SHOWN]
         )
+        if len(nodes) > _MAX_NODES_SHOWN:
+            info.append(f"  ... and {len(nodes) - _MAX_NODES_SHOWN} more")
 
-        if "error" in result:
-            return [TextContent(type="text", text=f"Error: {result['error']}")]
+    if get('tags'):
+        info.append(f"\nTags: {', '.join(tag.get('name', '') for tag in get('tags', []))}")
 
-        execution_data = result.get("data", {})
-        execution_id = execution_data.get("id", "unknown")
-        finished = execution_data.get("finished", False)
+    return [TextContent.model_construct(type="text", text="\n".join(info))]
 
-        response_text = f"Workflow executed!\nExecution ID: {execution_id}\nStatus: {'Finished' if finished else 'Running'}"
-        return [TextContent(type="text", text=response_text)]
 
-    elif name == "get_execution":
-        execution_id = arguments.get("execution_id")
-        result = await make_n8n_request("GET", f"executions/{execution_id}")
+async def _handle_execute_workflow(arguments: dict) -> list[TextContent]:
+    """Handle the execute_workflow tool"""
+    workflow_id = arguments.get("workflow_id")
+    input_data = arguments.get("input_data", "{}")
 
+    # Parse input data; most calls pass no payload, so skip the parser
+    # entirely for the common empty case
+    if not input_data or input_data == "{}":
+        data_payload = {}
+    else:
+        try:
+            data_payload = orjson.loads(input_data)
+        except orjson.JSONDecodeError:
+            return [TextContent.model_construct(type="text", text="Error: input_data must be valid JSON string")]
+
+    result = await make_n8n_request(
+        "POST",
+        f"workflows/{workflow_id}/execute",
+        data_payload
+    )
+
+    if "error" in result:
+        return [TextContent.model_construct(type="text", text=f"Error: {result['error']}")]
+
+    execution_data = result.get("data", {})
+    execution_id = execution_data.get("id", "unknown")
+    finished = execution_data.get("finished", False)
+
+    response_text = f"Workflow executed!\nExecution ID: {execution_id}\nStatus: {'Finished' if finished else 'Running'}"
+    return [TextContent.model_construct(type="text", text=response_text)]
+
+
+async def _handle_batch_get_workflows(arguments: dict) -> list[TextContent]:
+    """Handle the batch_get_workflows tool"""
+    workflow_ids = arguments.get("workflow_ids") or []
+
+    if not workflow_ids:
+        return [TextContent.model_construct(type="text", text="Error: workflow_ids must be a non-empty list")]
+
+    # Fire all requests concurrently over the shared keep-alive session
+    results = await asyncio.gather(
+        *(make_n8n_request("GET", f"workflows/{wid}") for wid in workflow_ids),
+        return_exceptions=True,
+    )
+
+    info = []
+    for i, (wid, result) in enumerate(zip(workflow_ids, results)):
+        # Yield between batched results so other tasks stay responsive
+        if i % 32 == 0:
+            await asyncio.sleep(0)
+        if isinstance(result, Exception):
+            info.append(f"- {wid}: Error: {result}")
+            continue
         if "error" in result:
-            return [TextContent(type="text", text=f"Error: {result['error']}")]
+            info.append(f"- {wid}: Error: {result['error']}")
+            continue
+        wf = result.get("data", {}) if "data" in result else result
+        info.append(
+            f"- {wf.get('name', 'Unnamed')} (ID: {wf.get('id')}) "
+            f"[{'Active' if wf.get('active') else 'Inactive'}] "
+            f"Nodes: {len(wf.get('nodes', []))}"
+        )
 
-        execution = result.get("data", {})
+    response_text = f"Fetched {len(workflow_ids)} workflow(s):\n" + "\n".join(info)
+    return [TextContent.model_construct(type="text", text=response_text)]
 
-        info = [
-            f"Execution ID: {execution.get('id')}",
-            f"Workflow: {execution.get('workflowData', {}).get('name', 'Unknown')}",
-            f"Status: {'Finished' if execution.get('finished') else 'Running'}",
-            f"Mode: {execution.get('mode', 'unknown')}",
-        ]
 
-        if execution.get("stoppedAt"):
-            info.append(f"Stopped at: {execution.get('stoppedAt')}")
+async def _handle_get_execution(arguments: dict) -> list[TextContent]:
+    """Handle the get_execution tool"""
+    execution_id = arguments.get("execution_id")
+    result = await make_n8n_request("GET", f"executions/{execution_id}")
 
-        return [TextContent(type="text", text="\n".join(info))]
+    if "error" in result:
+        return [TextContent.model_construct(type="text", text=f"Error: {result['error']}")]
 
-    elif name == "activate_workflow":
-        workflow_id = arguments.get("workflow_id")
-        result = await make_n8n_request(
-            "PATCH",
-            f"workflows/{workflow_id}",
-            {"active": True}
-        )
+    execution = result.get("data", {})
 
-        if "error" in result:
-            return [TextContent(type="text", text=f"Error: {result['error']}")]
+    # Bind the lookup once; the formatters below hit it repeatedly
+    get = execution.get
 
-        return [TextContent(type="text", text=f"Workflow {workflow_id} activated successfully!")]
+    info = [
+        f"Execution ID: {get('id')}",
+        f"Workflow: {get('workflowData', {}).get('name', 'Unknown')}",
+        f"Status: {'Finished' if get('finished') else 'Running'}",
+        f"Mode: {get('mode', 'unknown')}",
+    ]
 
-    elif name == "deactivate_workflow":
-        workflow_id = arguments.get("workflow_id")
-        result = await make_n8n_request(
-            "PATCH",
-            f"workflows/{workflow_id}",
-            {"active": False}
-        )
+    if get("stoppedAt"):
+        info.append(f"Stopped at: {get('stoppedAt')}")
 
-        if "error" in result:
-            return [TextContent(type="text", text=f"Error: {result['error']}")]
+    return [TextContent.model_construct(type="text", text="\n".join(info))]
 
-        return [TextContent(type="text", text=f"Workflow {workflow_id} deactivated successfully!")]
 
-    else:
-        return [TextContent(type="text", text=f"Unknown tool: {name}")]
+async def _handle_activate_workflow(arguments: dict) -> list[TextContent]:
+    """Handle the activate_workflow tool"""
+    workflow_id = arguments.get("workflow_id")
+    result = await make_n8n_request(
+        "PATCH",
+        f"workflows/{workflow_id}",
+        {"active": True}
+    )
+
+    if "error" in result:
+        return [TextContent.model_construct(type="text", text=f"Error: {result['error']}")]
+
+    return [TextContent.model_construct(type="text", text=f"Workflow {workflow_id} activated successfully!")]
+
+
+async def _handle_deactivate_workflow(arguments: dict) -> list[TextContent]:
+    """Handle the deactivate_workflow tool"""
+    workflow_id = arguments.get("workflow_id")
+    result = await make_n8n_request(
+        "PATCH",
+        f"workflows/{workflow_id}",
+        {"active": False}
+    )
+
+    if "error" in result:
+        return [TextContent.model_construct(type="text", text=f"Error: {result['error']}")]
+
+    return [TextContent.model_construct(type="text", text=f"Workflow {workflow_id} deactivated successfully!")]
+
+
+# O(1) tool-name dispatch table, built once at import
+_DISPATCH = {
+    "list_workflows": _handle_list_workflows,
+    "get_workflow": _handle_get_workflow,
+    "execute_workflow": _handle_execute_workflow,
+    "batch_get_workflows": _handle_batch_get_workflows,
+    "get_execution": _handle_get_execution,
+    "activate_workflow": _handle_activate_workflow,
+    "deactivate_workflow": _handle_deactivate_workflow,
+}
+
+
+@app.call_tool()
+async def call_tool(name: str, arguments: dict) -> list[TextContent]:
+    """Handle tool calls"""
+    handler = _DISPATCH.get(name)
+    if handler is None:
+        return [TextContent.model_construct(type="text", text=f"Unknown tool: {name}")]
+    return await handler(arguments)
 
 
 async def main():
     """Run the MCP server"""
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(read_stream, write_stream, app.create_initialization_options())
+    finally:
+        await close_n8n_session()
 
 
 if __name__ == "__main__":
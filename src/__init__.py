@@ -2,6 +2,16 @@
 n8n MCP Server Package
 """
 
-from .n8n_mcp_server import n8n_server
+from .n8n_client import make_n8n_request, close_n8n_session
 
-__all__ = ["n8n_server"]
+__all__ = ["n8n_server", "make_n8n_request", "close_n8n_session"]
+
+
+def __getattr__(name):
+    # Import the SDK server lazily so consumers that only need the shared
+    # client (like the standalone stdio server) don't pay the
+    # claude_agent_sdk import or build an unused server object
+    if name == "n8n_server":
+        from .n8n_mcp_server import n8n_server
+        return n8n_server
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,29 @@
+"""
+n8n configuration
+Reads the environment exactly once at import into an immutable config
+object so the rest of the code never re-parses env values.
+"""
+
+from dataclasses import dataclass
+import os
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+@dataclass(frozen=True, slots=True)
+class N8NConfig:
+    """Static n8n connection settings loaded from the environment"""
+    base_url: str
+    api_key: str
+    skip_ssl: bool
+
+
+CONFIG = N8NConfig(
+    base_url=os.getenv("N8N_BASE_URL", "http://localhost:5678").rstrip("/"),
+    api_key=os.getenv("N8N_API_KEY", ""),
+    skip_ssl=os.getenv("N8N_SKIP_SSL_VERIFY", "false").lower() == "true",
+)
+
+__all__ = ["N8NConfig", "CONFIG"]
@@ -0,0 +1,106 @@
+"""
+Shared n8n API client
+Owns the persistent HTTP session and request helper used by both the
+standalone MCP server and the Claude Agent SDK server, so only one
+connection pool exists per process and hot-path optimizations land once.
+"""
+
+from typing import Any
+
+# aiohttp is pinned with the [speedups] extra (see pyproject.toml) so its
+# C-accelerated HTTP parser is used; request bodies are pre-serialized with
+# orjson below, bypassing aiohttp's stdlib-json encoder entirely
+import aiohttp
+import orjson
+import ssl
+
+from src.config import CONFIG
+
+# The API key is static config, so decide once at import whether it is usable
+# instead of re-checking the env value on every call
+_CONFIG_OK = bool(CONFIG.api_key)
+_MISSING_KEY_ERROR = {
+    "error": "N8N_API_KEY not configured. Set environment variable N8N_API_KEY."
+}
+
+# Request constants derived from static config; built once at import so the
+# hot path does no f-string or dict work per call. _HEADERS must not be mutated.
+_URL_PREFIX = f"{CONFIG.base_url}/api/v1/"
+_HEADERS = {
+    "X-N8N-API-KEY": CONFIG.api_key,
+    "Content-Type": "application/json"
+}
+
+# SSL context is static config, so build it once at import instead of per call.
+# True keeps aiohttp's default certificate verification (ssl=None is
+# deprecated as a connector argument since aiohttp 3.9).
+_SSL_CONTEXT = True
+if CONFIG.skip_ssl:
+    _SSL_CONTEXT = ssl.create_default_context()
+    _SSL_CONTEXT.check_hostname = False
+    _SSL_CONTEXT.verify_mode = ssl.CERT_NONE
+
+# Acceptable response codes per HTTP method
+_OK_STATUSES = {
+    "GET": (200,),
+    "POST": (200, 201),
+    "PATCH": (200,),
+    "DELETE": (200, 204),
+}
+
+# Shared HTTP session, created lazily on first request and reused for the
+# lifetime of the server so every tool call rides the same keep-alive pool
+_session: aiohttp.ClientSession | None = None
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Return the shared ClientSession, creating it on first use"""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(ssl=_SSL_CONTEXT, limit=100, keepalive_timeout=75)
+        _session = aiohttp.ClientSession(connector=connector)
+    return _session
+
+
+async def close_n8n_session() -> None:
+    """Close the shared ClientSession on server shutdown"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def make_n8n_request(
+    method: str,
+    endpoint: str,
+    data: dict = None
+) -> dict[str, Any]:
+    """Helper function to make requests to n8n API"""
+    if not _CONFIG_OK:
+        # Copy so a caller mutating its result can't corrupt the template
+        return dict(_MISSING_KEY_ERROR)
+
+    url = _URL_PREFIX + endpoint
+
+    try:
+        session = await _get_session()
+        body = orjson.dumps(data) if data is not None and method != "GET" else None
+        async with session.request(
+            method, url, headers=_HEADERS, data=body
+        ) as response:
+            if response.status not in _OK_STATUSES[method]:
+                # Cap the error body at 1KB so a reverse proxy's HTML error
+                # page can't balloon into megabytes of transient strings
+                error_text = (await response.content.read(1024)).decode("utf-8", "replace")
+                return {"error": f"HTTP {response.status}: {error_text}"}
+            if method == "DELETE":
+                return {"success": True}
+            # n8n always answers with JSON; content_type=None skips aiohttp's
+            # per-response Content-Type header validation
+            return await response.json(content_type=None, loads=orjson.loads)
+
+    except Exception as e:
+        return {"error": f"Request failed: {e!r}"}
+
+
+__all__ = ["make_n8n_request", "close_n8n_session"]
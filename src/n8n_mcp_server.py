@@ -5,82 +5,20 @@ Provides tools to interact with n8n workflow automation platform
 
 from claude_agent_sdk import tool, create_sdk_mcp_server
 from typing import Any
-import aiohttp
-import os
-import json
-import ssl
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# n8n configuration - can be set via environment variables
-N8N_BASE_URL = os.getenv("N8N_BASE_URL", "http://localhost:5678").rstrip("/")
-N8N_API_KEY = os.getenv("N8N_API_KEY", "")
-N8N_SKIP_SSL_VERIFY = os.getenv("N8N_SKIP_SSL_VERIFY", "false").lower() == "true"
-
-
-async def make_n8n_request(
-    method: str,
-    endpoint: str,
-    data: dict = None
-) -> dict[str, Any]:
-    """Helper function to make requests to n8n API"""
-    if not N8N_API_KEY:
-        return {
-            "error": "N8N_API_KEY not configured. Set environment variable N8N_API_KEY."
-        }
-
-    url = f"{N8N_BASE_URL}/api/v1/{endpoint}"
-    headers = {
-        "X-N8N-API-KEY": N8N_API_KEY,
-        "Content-Type": "application/json"
-    }
+import asyncio
+import orjson
 
-    # Configure SSL context
-    ssl_context = None
-    if N8N_SKIP_SSL_VERIFY:
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
+# Shared n8n API client (owns config, SSL context, and the keep-alive session)
+from src.n8n_client import make_n8n_request, close_n8n_session
 
-    try:
-        connector = aiohttp.TCPConnector(ssl=ssl_context) if ssl_context else None
-        async with aiohttp.ClientSession(connector=connector) as session:
-            if method == "GET":
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        return {"error": f"HTTP {response.status}: {error_text}"}
-
-            elif method == "POST":
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status in [200, 201]:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        return {"error": f"HTTP {response.status}: {error_text}"}
-
-            elif method == "PATCH":
-                async with session.patch(url, headers=headers, json=data) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        return {"error": f"HTTP {response.status}: {error_text}"}
-
-            elif method == "DELETE":
-                async with session.delete(url, headers=headers) as response:
-                    if response.status in [200, 204]:
-                        return {"success": True}
-                    else:
-                        error_text = await response.text()
-                        return {"error": f"HTTP {response.status}: {error_text}"}
 
-    except Exception as e:
-        return {"error": f"Request failed: {str(e)}"}
+def _workflow_line(wf: dict) -> str:
+    """Format a one-line summary of a workflow"""
+    get = wf.get
+    return (
+        f"- {get('name', 'Unnamed')} (ID: {get('id')}) "
+        f"[{'Active' if get('active') else 'Inactive'}]"
+    )
 
 
 @tool(
@@ -113,14 +51,18 @@ async def list_workflows(args: dict[str, Any]) -> dict[str, Any]:
             }
 
         # Format workflow list
-        workflow_list = []
-        for wf in workflows:
-            workflow_list.append(
-                f"- {wf.get('name', 'Unnamed')} (ID: {wf.get('id')}) "
-                f"[{'Active' if wf.get('active') else 'Inactive'}]"
-            )
-
-        response_text = f"Found {len(workflows)} workflow(s):\n" + "\n".join(workflow_list)
+        if len(workflows) > 50:
+            # Yield to the event loop periodically so formatting a big
+            # listing doesn't starve other ready tasks
+            lines = []
+            for i, wf in enumerate(workflows):
+                if i % 32 == 0:
+                    await asyncio.sleep(0)
+                lines.append(_workflow_line(wf))
+            body = "\n".join(lines)
+        else:
+            body = "\n".join(map(_workflow_line, workflows))
+        response_text = f"Found {len(workflows)} workflow(s):\n" + body
 
         return {
             "content": [{
@@ -160,16 +102,20 @@ async def get_workflow(args: dict[str, Any]) -> dict[str, Any]:
             }
 
         wf = result.get("data", {})
+
+        # Bind the lookup once; the formatters below hit it repeatedly
+        get = wf.get
+
         info = [
-            f"Workflow: {wf.get('name', 'Unnamed')}",
-            f"ID: {wf.get('id')}",
-            f"Status: {'Active' if wf.get('active') else 'Inactive'}",
-            f"Nodes: {len(wf.get('nodes', []))}",
-            f"Connections: {len(wf.get('connections', {}))}",
+            f"Workflow: {get('name', 'Unnamed')}",
+            f"ID: {get('id')}",
+            f"Status: {'Active' if get('active') else 'Inactive'}",
+            f"Nodes: {len(get('nodes', []))}",
+            f"Connections: {len(get('connections', {}))}",
         ]
 
-        if wf.get('tags'):
-            info.append(f"Tags: {', '.join([tag.get('name', '') for tag in wf.get('tags', [])])}")
+        if get('tags'):
+            info.append(f"Tags: {', '.join(tag.get('name', '') for tag in get('tags', []))}")
 
         return {
             "content": [{
@@ -198,12 +144,14 @@ async def execute_workflow(args: dict[str, Any]) -> dict[str, Any]:
     try:
         workflow_id = args["workflow_id"]
 
-        # Parse input data if provided
+        # Parse input data if provided; most calls pass no payload, so skip
+        # the parser entirely for the common empty case
         data_payload = {}
-        if args.get("input_data"):
+        raw = args.get("input_data")
+        if raw and raw != "{}":
             try:
-                data_payload = json.loads(args["input_data"])
-            except json.JSONDecodeError:
+                data_payload = orjson.loads(raw)
+            except orjson.JSONDecodeError:
                 return {
                     "content": [{
                         "type": "text",
@@ -250,6 +198,68 @@ async def execute_workflow(args: dict[str, Any]) -> dict[str, Any]:
         }
 
 
+@tool(
+    "batch_get_workflows",
+    "Get details for several workflows at once by their IDs. Fetches them concurrently.",
+    {"workflow_ids": list}
+)
+async def batch_get_workflows(args: dict[str, Any]) -> dict[str, Any]:
+    """Get details for multiple workflows concurrently"""
+    try:
+        workflow_ids = args.get("workflow_ids") or []
+
+        if not workflow_ids:
+            return {
+                "content": [{
+                    "type": "text",
+                    "text": "Error: workflow_ids must be a non-empty list"
+                }],
+                "is_error": True
+            }
+
+        # Fire all requests concurrently over the shared keep-alive session
+        results = await asyncio.gather(
+            *(make_n8n_request("GET", f"workflows/{wid}") for wid in workflow_ids),
+            return_exceptions=True,
+        )
+
+        info = []
+        for i, (wid, result) in enumerate(zip(workflow_ids, results)):
+            # Yield between batched results so other tasks stay responsive
+            if i % 32 == 0:
+                await asyncio.sleep(0)
+            if isinstance(result, Exception):
+                info.append(f"- {wid}: Error: {result}")
+                continue
+            if "error" in result:
+                info.append(f"- {wid}: Error: {result['error']}")
+                continue
+            wf = result.get("data", {}) if "data" in result else result
+            info.append(
+                f"- {wf.get('name', 'Unnamed')} (ID: {wf.get('id')}) "
+                f"[{'Active' if wf.get('active') else 'Inactive'}] "
+                f"Nodes: {len(wf.get('nodes', []))}"
+            )
+
+        response_text = f"Fetched {len(workflow_ids)} workflow(s):\n" + "\n".join(info)
+
+        return {
+            "content": [{
+                "type": "text",
+                "text": response_text
+            }]
+        }
+
+    except Exception as e:
+        return {
+            "content": [{
+                "type": "text",
+                "text": f"Failed to batch get workflows: {str(e)}"
+            }],
+            "is_error": True
+        }
+
+
 @tool(
     "get_execution",
     "Get the status and result of a workflow execution by execution ID.",
@@ -272,15 +282,18 @@ async def get_execution(args: dict[str, Any]) -> dict[str, Any]:
 
         execution = result.get("data", {})
 
+        # Bind the lookup once; the formatters below hit it repeatedly
+        get = execution.get
+
         info = [
-            f"Execution ID: {execution.get('id')}",
-            f"Workflow: {execution.get('workflowData', {}).get('name', 'Unknown')}",
-            f"Status: {'Finished' if execution.get('finished') else 'Running'}",
-            f"Mode: {execution.get('mode', 'unknown')}",
+            f"Execution ID: {get('id')}",
+            f"Workflow: {get('workflowData', {}).get('name', 'Unknown')}",
+            f"Status: {'Finished' if get('finished') else 'Running'}",
+            f"Mode: {get('mode', 'unknown')}",
         ]
 
-        if execution.get("stoppedAt"):
-            info.append(f"Stopped at: {execution.get('stoppedAt')}")
+        if get("stoppedAt"):
+            info.append(f"Stopped at: {get('stoppedAt')}")
 
         return {
             "content": [{
@@ -389,6 +402,7 @@ n8n_server = create_sdk_mcp_server(
         list_workflows,
         get_workflow,
         execute_workflow,
+        batch_get_workflows,
         get_execution,
         activate_workflow,
         deactivate_workflow
@@ -397,4 +411,4 @@ n8n_server = create_sdk_mcp_server(
 
 
 # Export the server for use in other modules
-__all__ = ["n8n_server"]
+__all__ = ["n8n_server", "close_n8n_session"]